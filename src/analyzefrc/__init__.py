@@ -8,5 +8,7 @@ from analyzefrc.process import *
 from analyzefrc.plot import *
 from analyzefrc.file_read import *
 from analyzefrc.helper import *
+from analyzefrc.plan import *
+from analyzefrc.batch import *
 
 __version__ = '0.1.5'
@@ -0,0 +1,75 @@
+# Copyright (C) 2021                Department of Imaging Physics
+# All rights reserved               Faculty of Applied Sciences
+#                                   TU Delft
+# Tip ten Brink
+
+from typing import Optional
+
+import numpy as np
+
+from analyzefrc.plan import FRCPlan, get_plan
+
+__all__ = ['binom_split_batch', 'one_frc_batch', 'two_frc_batch', 'frc_batch']
+
+
+def binom_split_batch(img: np.ndarray, n: int, method: int = 1,
+                      rng: Optional[np.random.Generator] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Perform n binomial splits of a single image at once, returning two stacks of shape (n, *img.shape).
+    Like frc.frc_functions.one_frc, the pixel values are truncated to integers for sampling. Method 1 uses the
+    difference between the image and the sampled image as second half, method 2 samples both halves independently.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    counts = np.floor(np.clip(img, 0, None)).astype(np.int64)
+    if method == 1:
+        halves_1 = rng.binomial(counts, 0.5, size=(n, *img.shape)).astype(img.dtype)
+        halves_2 = img - halves_1
+    elif method == 2:
+        halves_1 = rng.binomial(counts, 0.5, size=(n, *img.shape)).astype(img.dtype)
+        halves_2 = rng.binomial(counts, 0.5, size=(n, *img.shape)).astype(img.dtype)
+    else:
+        raise ValueError("Choose either method 1 or 2 for binomial split.")
+    return halves_1, halves_2
+
+
+def frc_batch(imgs_1: np.ndarray, imgs_2: np.ndarray, plan: Optional[FRCPlan] = None) -> np.ndarray:
+    """
+    Compute the FRC curves of two stacks of square images of shape (n, size, size) in one batched FFT and one
+    vectorized ring binning pass. Returns an array of shape (n, size // 2), matching frc.frc_functions.two_frc for
+    each pair.
+
+    :param plan: Ring binning plan for the image size, retrieved from the plan cache if not provided.
+    """
+    if imgs_1.shape != imgs_2.shape or imgs_1.ndim != 3 or imgs_1.shape[1] != imgs_1.shape[2]:
+        raise ValueError("Image stacks must have equal (n, size, size) shapes!")
+    if plan is None:
+        plan = get_plan(imgs_1.shape[1:], imgs_1.dtype)
+
+    fourier_1 = np.fft.rfft2(imgs_1)
+    fourier_2 = np.fft.rfft2(imgs_2)
+
+    frc_num = plan.ring_sum(np.real(fourier_1 * np.conj(fourier_2)))
+    frc_denom_1 = plan.ring_sum(np.abs(fourier_1) ** 2)
+    frc_denom_2 = plan.ring_sum(np.abs(fourier_2) ** 2)
+
+    return frc_num / np.sqrt(frc_denom_1 * frc_denom_2)
+
+
+def one_frc_batch(img: np.ndarray, n: int, method: int = 1, rng: Optional[np.random.Generator] = None,
+                  plan: Optional[FRCPlan] = None) -> np.ndarray:
+    """
+    Compute n 1FRC curves of a square image, using one stacked binomial split and one batched FRC.
+    Returns an array of shape (n, size // 2).
+    """
+    halves_1, halves_2 = binom_split_batch(img, n, method, rng)
+    return frc_batch(halves_1, halves_2, plan)
+
+
+def two_frc_batch(img1: np.ndarray, img2: np.ndarray, n: int = 1, plan: Optional[FRCPlan] = None) -> np.ndarray:
+    """
+    Compute the 2FRC curve of two square images. As there is no randomness, it is computed once and repeated n
+    times, returning an array of shape (n, size // 2).
+    """
+    frc_curve = frc_batch(img1.reshape((1, *img1.shape)), img2.reshape((1, *img2.shape)), plan)
+    return np.repeat(frc_curve, n, axis=0)
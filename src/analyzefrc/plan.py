@@ -0,0 +1,99 @@
+# Copyright (C) 2021                Department of Imaging Physics
+# All rights reserved               Faculty of Applied Sciences
+#                                   TU Delft
+# Tip ten Brink
+
+from functools import lru_cache
+from dataclasses import dataclass, field
+
+import numpy as np
+
+__all__ = ['FRCPlan', 'get_plan', 'clear_plans']
+
+# Maximum number of distinct (shape, dtype) plans that are kept in memory
+PLAN_CACHE_SIZE = 16
+
+
+@dataclass
+class FRCPlan:
+    """
+    Precomputed ring binning for the FRC of square images of a specific shape and dtype. Contains the ring index of
+    every element of the real 2D FFT, the weights that make sums over the half plane equal sums over the full plane,
+    the number of pixels in each ring and the frequency axis. Use get_plan to retrieve a cached plan.
+    """
+    shape: tuple[int, int]
+    dtype: np.dtype
+    ring_index: np.ndarray  # Flattened ring index of each real FFT element
+    weights: np.ndarray  # Flattened multiplicity of each real FFT element
+    n_bins: int  # Number of rings in the real FFT, including the incomplete ones beyond size / 2
+    n_rings: int  # Number of complete rings, the length of an FRC curve
+    ring_counts: np.ndarray  # Number of full plane pixels in each complete ring
+    xs_pix: np.ndarray  # Frequency axis in 1/pixel
+    _xs_len_freq: dict = field(default_factory=dict, repr=False)
+    _batch_index: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def create(cls, shape: tuple[int, int], dtype=np.float64) -> 'FRCPlan':
+        if len(shape) != 2 or shape[0] != shape[1]:
+            raise ValueError("FRC plans are only defined for square 2D images!")
+        size = shape[0]
+        dtype = np.dtype(dtype)
+        # Real FFT output uses the same precision as its input
+        real_dtype = np.float32 if dtype == np.float32 else np.float64
+
+        ky = np.fft.fftfreq(size) * size
+        kx = np.fft.rfftfreq(size) * size
+        ring_index = np.floor(np.sqrt(ky.reshape((size, 1)) ** 2 + kx.reshape((1, -1)) ** 2)).astype(np.intp)
+
+        col_weights = np.full(size // 2 + 1, 2., dtype=real_dtype)
+        col_weights[0] = 1.
+        if size % 2 == 0:
+            col_weights[-1] = 1.
+        weights = np.broadcast_to(col_weights, ring_index.shape).ravel()
+
+        n_bins = int(ring_index.max()) + 1
+        n_rings = size // 2
+        ring_index = ring_index.ravel()
+        ring_counts = np.bincount(ring_index, weights, minlength=n_bins)[:n_rings]
+        xs_pix = np.arange(n_rings) / size
+        # Plans are shared, so prevent arrays from being modified in place
+        for arr in (ring_index, ring_counts, xs_pix):
+            arr.setflags(write=False)
+        return cls(tuple(shape), dtype, ring_index, weights, n_bins, n_rings, ring_counts, xs_pix)
+
+    def xs_len_freq(self, len_per_pixel: float) -> np.ndarray:
+        """ Frequency axis in 1/length units, cached per len_per_pixel. """
+        if len_per_pixel not in self._xs_len_freq:
+            xs_len_freq = self.xs_pix * (1 / len_per_pixel)
+            xs_len_freq.setflags(write=False)
+            self._xs_len_freq[len_per_pixel] = xs_len_freq
+        return self._xs_len_freq[len_per_pixel]
+
+    def batch_index(self, n: int) -> np.ndarray:
+        """ Ring indices offset per curve, so a stack of n spectra can be binned with a single bincount. """
+        if n not in self._batch_index:
+            offsets = self.n_bins * np.arange(n).reshape((n, 1))
+            self._batch_index[n] = (self.ring_index.reshape((1, -1)) + offsets).ravel()
+        return self._batch_index[n]
+
+    def ring_sum(self, values: np.ndarray) -> np.ndarray:
+        """ Sum a stack of real FFT-shaped arrays of shape (n, size, size // 2 + 1) over each complete ring. """
+        n = values.shape[0]
+        weighted = (values.reshape((n, -1)) * self.weights).ravel()
+        sums = np.bincount(self.batch_index(n), weighted, minlength=n * self.n_bins)
+        return sums.reshape((n, self.n_bins))[:, :self.n_rings]
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _cached_plan(shape: tuple[int, int], dtype: np.dtype) -> FRCPlan:
+    return FRCPlan.create(shape, dtype)
+
+
+def get_plan(shape: tuple[int, ...], dtype=np.float64) -> FRCPlan:
+    """ Retrieve the FRCPlan for square images of this shape and dtype from a bounded LRU cache. """
+    return _cached_plan(tuple(int(s) for s in shape), np.dtype(dtype))
+
+
+def clear_plans():
+    """ Empty the FRCPlan cache. """
+    _cached_plan.cache_clear()
@@ -5,15 +5,17 @@
 from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Union
 from functools import partial
-from dataclasses import dataclass
+from itertools import repeat
+from dataclasses import dataclass, replace
 from frc.deps_types import NoIntersectionException
 import frc.frc_functions as frcf
 import frc.utility as util
 import numpy as np
-from deco import concurrent, synchronized
 from loess.loess_1d import loess_1d
 
 from analyzefrc.read import MeasureProcessing, FRCMeasurement, FRCSet, Curve, CurveTask
+from analyzefrc.plan import FRCPlan, get_plan
+import analyzefrc.batch as batch
 
 __all__ = ['group_all', 'group_sets', 'group_measures', 'process_frc', 'group_curves']
 
@@ -31,20 +33,30 @@ def _process_task(task: _ProcessTask, i, task_n) -> list[Curve]:
     return task.measure.curves
 
 
-@concurrent
-def _process_task_conc(task: _ProcessTask, i, task_n):
-    print(f"Processing {i + 1} out of {task_n}...")
-    for processing in task.processings:
-        task.measure = processing(task.measure)
-    return task.measure.curves
+def _result_curves(curves: list[Curve]) -> list[Curve]:
+    """ Copy curves so they refer to a copy of their measurement without image data. """
+    if not curves:
+        return curves
+    result_measure = replace(curves[0].measure, image=None, image_2=None, curves=None)
+    result_measure.curves = [replace(curve, measure=result_measure) for curve in curves]
+    return result_measure.curves
 
 
-@synchronized
-def _process_measures_conc(measure_tasks: list[_ProcessTask]) -> dict:
+def _process_task_pool(task: _ProcessTask, i, task_n) -> tuple[str, list[Curve]]:
+    """ Runs in a worker process, only the curves are returned, without any image data. """
+    curves = _process_task(task, i, task_n)
+    return task.measure.id, _result_curves(curves)
+
+
+def _process_measures_pool(measure_tasks: list[_ProcessTask], max_workers: Optional[int] = None,
+                           chunksize: int = 1) -> dict[str, list[Curve]]:
     processed_measures = {}
     task_n = len(measure_tasks)
-    for i, task in enumerate(measure_tasks):
-        processed_measures[(task.measure.set_id, task.measure.index)] = _process_task_conc(task, i, task_n)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Results are returned in task order
+        results = executor.map(_process_task_pool, measure_tasks, range(task_n), repeat(task_n), chunksize=chunksize)
+        for measure_id, curves in results:
+            processed_measures[measure_id] = curves
     return processed_measures
 
 
@@ -58,7 +70,7 @@ def _process_measures(measure_tasks: list[_ProcessTask]) -> dict[str, list[Curve
 
 def _create_tasks(frc_sets: Union[list[FRCSet], FRCSet], preprocess=True,
                   extra_processings: Optional[list[MeasureProcessing]] = None,
-                  override_n: int = 0, frc1_method: int = 1) -> list[_ProcessTask]:
+                  override_n: int = 0, frc1_method: int = 1, batched: bool = False) -> list[_ProcessTask]:
     if isinstance(frc_sets, FRCSet):
         frc_sets = [frc_sets]
     process_tasks = []
@@ -73,7 +85,8 @@ def _create_tasks(frc_sets: Union[list[FRCSet], FRCSet], preprocess=True,
             if measure.extra_processings is not None:
                 tasks += measure.extra_processings
 
-            override_n_measure = partial(measure_curve, override_n=override_n, frc1_method=frc1_method)
+            override_n_measure = partial(measure_curve, override_n=override_n, frc1_method=frc1_method,
+                                         batched=batched)
 
             tasks.append(override_n_measure)
             process_tasks.append(_ProcessTask(tasks, measure))
@@ -123,14 +136,17 @@ def group_sets(curves: list[Curve]) -> dict[str, list[Curve]]:
 
 def process_frc(process_name: str, frc_sets: Union[list[FRCSet], FRCSet], preprocess=True, concurrency=False,
                 grouping: str = 'measures', override_n: int = 0, frc1_method: int = 1,
-                extra_processings: Optional[list[MeasureProcessing]] = None) -> dict[str, list[Curve]]:
+                extra_processings: Optional[list[MeasureProcessing]] = None,
+                batched: bool = False, max_workers: Optional[int] = None,
+                chunksize: int = 1) -> dict[str, list[Curve]]:
     """
     Process prepared FRCSets and compute curves.
 
     :param str process_name: Name of the overall process. Used as plot title in case everything is grouped together.
     :param frc_sets: Single FRCSet or list of FRCSets to process.
     :param bool preprocess: Crop images to square dimensions and apply Tukey window to prevent FFT artifacts.
-    :param bool concurrency: Use deco for additional multithreading, can result in speedup. Call this function from an
+    :param bool concurrency: Process measurements in a pool of worker processes. Workers only return the curves, the
+        measurements attached to the returned curves do not contain image data. Call this function from an
         if __name__ == '__main__' block if using this option.
     :param str grouping: Grouping name used to group curves for later plotting. By default, curves within an
         FRCMeasurement are grouped together.
@@ -139,10 +155,17 @@ def process_frc(process_name: str, frc_sets: Union[list[FRCSet], FRCSet], prepro
     :param int frc1_method: Override the 1FRC method used. Defaults to single split and then subtract.
     :param extra_processings: Additional processing functions that are performed after preprocessing and before
         per-measurement extra processings.
+    :param bool batched: Compute all averaged curves of a CurveTask at once, using one stacked binomial split, one
+        batched FFT and one vectorized ring binning pass. Uses more memory (avg_n images at a time) but is faster.
+    :param max_workers: Maximum number of worker processes if concurrency is enabled. Defaults to the number of CPUs.
+    :param int chunksize: Number of measurements submitted to a worker at once if concurrency is enabled.
     """
     print("Processing FRC sets...")
-    tasks = _create_tasks(frc_sets, preprocess, extra_processings, override_n, frc1_method)
-    processed_measures = _process_measures_conc(tasks) if concurrency else _process_measures(tasks)
+    tasks = _create_tasks(frc_sets, preprocess, extra_processings, override_n, frc1_method, batched)
+    if concurrency:
+        processed_measures = _process_measures_pool(tasks, max_workers, chunksize)
+    else:
+        processed_measures = _process_measures(tasks)
     processed_curves = [curve for curves in processed_measures.values() for curve in curves]
     print(f"Finished processing, returning curves grouped by {grouping}.")
     if grouping == 'sets':
@@ -169,16 +192,32 @@ def preprocess_img(img: np.ndarray) -> np.ndarray:
     return util.apply_tukey(img)
 
 
-def measure_curve(measure: FRCMeasurement, override_n: int = 0, frc1_method: int = 1) -> FRCMeasurement:
-    """ Compute curves for an FRCMeasurement. """
+def _measure_batch(curve_task: CurveTask, img: np.ndarray, img2: Optional[np.ndarray], plan: FRCPlan) -> np.ndarray:
+    """ Compute all avg_n curves of a CurveTask at once, returns an array of shape (avg_n, curve length). """
+    if curve_task.method == '1FRC' or curve_task.method == '1FRC1':
+        return batch.one_frc_batch(img, curve_task.avg_n, 1, plan=plan)
+    elif curve_task.method == '2FRC':
+        return batch.two_frc_batch(img, img2, curve_task.avg_n, plan=plan)
+    elif curve_task.method == '1FRC2':
+        return batch.one_frc_batch(img, curve_task.avg_n, 2, plan=plan)
+    else:
+        raise ValueError("Unknown method {}".format(curve_task.method))
+
+
+def measure_curve(measure: FRCMeasurement, override_n: int = 0, frc1_method: int = 1,
+                  batched: bool = False) -> FRCMeasurement:
+    """
+    Compute curves for an FRCMeasurement. If batched is True, all curves used for averaging are computed in a
+    single vectorized pass (see analyzefrc.batch).
+    """
     img = measure.image
     # Can be None
     img2 = measure.image_2
     img_size = img.shape[0]
     len_per_pixel = measure.settings.len_per_pixel
-    # For correct dimensions we use the first curve calculation below
-    xs_pix = None
-    xs_len_freq = None
+    # Ring binning and frequency axes are shared by all images of the same size
+    plan = get_plan(img.shape, img.dtype)
+    xs_len_freq = plan.xs_len_freq(len_per_pixel)
 
     # Initialize default curve tasks
     if measure.curve_tasks is None:
@@ -197,34 +236,36 @@ def measure_curve(measure: FRCMeasurement, override_n: int = 0, frc1_method: int
         if override_n >= 1:
             curve_task.avg_n = override_n
 
-        # Decide method
-        if curve_task.method == '1FRC' or curve_task.method == '1FRC1':
-            def frc_func(img_frc, _img2):
-                return frcf.one_frc(img_frc, 1)
-        elif curve_task.method == '2FRC':
-            def frc_func(img_frc_1, img_frc_2):
-                return frcf.two_frc(img_frc_1, img_frc_2)
-        elif curve_task.method == '1FRC2':
-            # Experimental
-            def frc_func(img_frc, _img2):
-                return frcf.one_frc(img_frc, 2)
+        if batched:
+            frc_curves = _measure_batch(curve_task, img, img2, plan)
+            frc_curve = np.mean(frc_curves, axis=0)
         else:
-            raise ValueError("Unknown method {}".format(curve_task.method))
+            # Decide method
+            if curve_task.method == '1FRC' or curve_task.method == '1FRC1':
+                def frc_func(img_frc, _img2):
+                    return frcf.one_frc(img_frc, 1)
+            elif curve_task.method == '2FRC':
+                def frc_func(img_frc_1, img_frc_2):
+                    return frcf.two_frc(img_frc_1, img_frc_2)
+            elif curve_task.method == '1FRC2':
+                # Experimental
+                def frc_func(img_frc, _img2):
+                    return frcf.one_frc(img_frc, 2)
+            else:
+                raise ValueError("Unknown method {}".format(curve_task.method))
 
-        frc_curve = frc_func(img, img2)
+            frc_curve = frc_func(img, img2)
 
-        # Only calculate the first time
-        xs_pix = np.arange(len(frc_curve)) / img_size if xs_pix is None else xs_pix
-        xs_len_freq = xs_pix * (1 / len_per_pixel) if xs_len_freq is None else xs_len_freq
+            # Curve averaging
+            frc_curves = [frc_curve]
+            for i in range(curve_task.avg_n - 1):
+                calculated_frc = frc_func(img, img2)
+                frc_curve += calculated_frc
+                frc_curves.append(calculated_frc)
 
-        # Curve averaging
-        frc_curves = [frc_curve]
-        for i in range(curve_task.avg_n - 1):
-            calculated_frc = frc_func(img, img2)
-            frc_curve += calculated_frc
-            frc_curves.append(calculated_frc)
+            frc_curve /= curve_task.avg_n
 
-        frc_curve /= curve_task.avg_n
+        xs_pix = plan.xs_pix
 
         curve_key = f"{measure.name}"
 
@@ -0,0 +1,26 @@
+import numpy as np
+import frc.frc_functions as frcf
+import analyzefrc as afrc
+import analyzefrc.process
+from analyzefrc import FRCMeasurement
+
+
+def test_frc_batch_matches_two_frc():
+    rng = np.random.default_rng(42)
+    imgs_1 = rng.poisson(20, (3, 64, 64)).astype(float)
+    imgs_2 = rng.poisson(20, (3, 64, 64)).astype(float)
+
+    curves = afrc.frc_batch(imgs_1, imgs_2)
+    assert curves.shape == (3, 32)
+    for i in range(3):
+        np.testing.assert_allclose(curves[i], frcf.two_frc(imgs_1[i], imgs_2[i]), atol=1e-6)
+
+
+def test_measure_curve_batched():
+    data_array: np.ndarray = afrc.get_image('./siemens.tiff')
+
+    frc_1: FRCMeasurement = afrc.frc_measure(data_array, set_name='1FRC')
+    measure_with_curves = analyzefrc.process.measure_curve(frc_1, batched=True)
+    curve = measure_with_curves.curves[0]
+    assert curve.curve_y.shape == (data_array.shape[0] // 2,)
+    assert curve.frc_res > 0
@@ -0,0 +1,11 @@
+import numpy as np
+import analyzefrc as afrc
+
+
+def test_plan_cached_per_shape_and_dtype():
+    plan = afrc.get_plan((64, 64), np.float64)
+    assert afrc.get_plan((64, 64), np.float64) is plan
+    assert afrc.get_plan((64, 64), np.float32) is not plan
+    assert plan.xs_pix.shape == (32,)
+    # Ring counts over the full plane approximately equal the ring circumference
+    np.testing.assert_allclose(plan.ring_counts[10:20], 2 * np.pi * np.arange(10, 20) + np.pi, rtol=0.15)
@@ -0,0 +1,18 @@
+import numpy as np
+import analyzefrc as afrc
+
+
+def _poisson_set(n=3, size=64):
+    rng = np.random.default_rng(0)
+    measures = [afrc.frc_measure(rng.poisson(50, (size, size)).astype(float), name=str(i)) for i in range(n)]
+    return afrc.frc_set(*measures, name='poisson')
+
+
+def test_process_frc_pool_keys_and_order():
+    frc_set = _poisson_set()
+    serial = afrc.process_frc('serial', frc_set, override_n=2)
+    pooled = afrc.process_frc('pool', _poisson_set(), concurrency=True, max_workers=2, chunksize=2, override_n=2)
+    assert list(pooled) == list(serial) == ['poisson-c0', 'poisson-c1', 'poisson-c2']
+    for curves in pooled.values():
+        assert curves[0].measure.image is None
+        assert curves[0].curve_y.shape == (32,)